@@ -147,6 +147,35 @@ class BrewTest(unittest.TestCase):
         self.model.Validate()
         self.assertEqual(res, 15)
 
+    def test_arg_scope_restored_on_exception(self):
+        myhelper = self.myhelper
+        self.assertEqual(brew.get_current_scope(), {})
+
+        with self.assertRaises(KeyError):
+            with brew.arg_scope([myhelper], val=5):
+                raise KeyError()
+
+        self.assertEqual(brew.get_current_scope(), {})
+        self.assertEqual(brew.myhelper(self.model), -1)
+
+    def test_arg_scope_inner_keeps_outer(self):
+        myhelper = self.myhelper
+        myhelper2 = self.myhelper2
+        with brew.arg_scope([myhelper, myhelper2], val=3):
+            outer_scope = brew.get_current_scope()
+            outer_kwargs = outer_scope['myhelper']
+            with brew.arg_scope([myhelper], val=7):
+                inner_scope = brew.get_current_scope()
+                self.assertIsNot(inner_scope['myhelper'], outer_kwargs)
+                self.assertEqual(inner_scope['myhelper'], {'val': 7})
+                self.assertEqual(outer_kwargs, {'val': 3})
+                self.assertEqual(brew.myhelper(self.model), 7)
+                self.assertEqual(brew.myhelper2(self.model), 3)
+            self.assertIs(brew.get_current_scope(), outer_scope)
+            self.assertIs(brew.get_current_scope()['myhelper'], outer_kwargs)
+            self.assertEqual(outer_kwargs, {'val': 3})
+            self.assertEqual(brew.myhelper(self.model), 3)
+
     def test_double_register(self):
         myhelper = self.myhelper
         with self.assertRaises(AttributeError):
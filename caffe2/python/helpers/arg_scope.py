@@ -2,7 +2,6 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 import contextlib
-import copy
 import threading
 
 _threadlocal_scope = threading.local()
@@ -15,17 +14,23 @@ def arg_scope(single_helper_or_list, **kwargs):
         assert callable(single_helper_or_list), \
             "arg_scope is only supporting single or a list of helper functions."
         single_helper_or_list = [single_helper_or_list]
-    old_scope = copy.deepcopy(get_current_scope())
+    old_scope = get_current_scope()
+    # Only the entries of the given helpers are rebuilt; the enclosing scope
+    # is shared, never mutated, and simply put back on exit.
+    new_scope = dict(old_scope)
     for helper in single_helper_or_list:
         assert callable(helper), \
             "arg_scope is only supporting a list of callable helper functions."
         helper_key = helper.__name__
-        if helper_key not in old_scope:
-            _threadlocal_scope.current_scope[helper_key] = {}
-        _threadlocal_scope.current_scope[helper_key].update(kwargs)
+        helper_kwargs = dict(old_scope.get(helper_key, {}))
+        helper_kwargs.update(kwargs)
+        new_scope[helper_key] = helper_kwargs
+    _threadlocal_scope.current_scope = new_scope
 
-    yield
-    _threadlocal_scope.current_scope = old_scope
+    try:
+        yield
+    finally:
+        _threadlocal_scope.current_scope = old_scope
 
 
 def get_current_scope():
@@ -5,9 +5,8 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import contextlib
 import threading
-from past.builtins import basestring
+from six import string_types
 
 from caffe2.proto import caffe2_pb2
 
@@ -15,73 +14,123 @@ from caffe2.proto import caffe2_pb2
 # The name scope and device scope when creating a new operator.
 _NAMESCOPE_SEPARATOR = '/'
 
-_threadlocal_scope = threading.local()
+
+class _ScopeState(threading.local):
+    # Class-level defaults are seen by every thread until it assigns its own
+    # value, so reads never need a hasattr/getattr fallback.
+    namescope = ''
+    devicescope = None
+
+    def __init__(self):
+        # Runs once per thread; the device scopes saved by the enclosing
+        # EmptyDeviceScope() blocks.
+        self.empty_devicescope_stack = []
+
+
+_threadlocal_scope = _ScopeState()
+
+# Nested name scopes keyed by (parent scope, prefix), so that re-entering
+# the same NameScope under the same parent reuses one string instead of
+# concatenating a new one. Cleared wholesale once it grows past the limit.
+_namescope_cache = {}
+_NAMESCOPE_CACHE_MAX_SIZE = 4096
 
 
 def CurrentNameScope():
-    global _threadlocal_scope
-    if not hasattr(_threadlocal_scope, "namescope"):
-        _threadlocal_scope.namescope = ''
     return _threadlocal_scope.namescope
 
 
 def CurrentDeviceScope():
-    global _threadlocal_scope
-    if not hasattr(_threadlocal_scope, "devicescope"):
-        _threadlocal_scope.devicescope = None
     return _threadlocal_scope.devicescope
 
 
-@contextlib.contextmanager
-def NameScope(prefix, reset=False):
-    global _threadlocal_scope
-    assert isinstance(prefix, basestring) or prefix is None, \
-        "NameScope takes in a string as its argument."
-    old_scope = CurrentNameScope()
-    prefix = prefix + _NAMESCOPE_SEPARATOR if prefix else ''
-    if reset:
-        _threadlocal_scope.namescope = prefix
-    else:
-        _threadlocal_scope.namescope = _threadlocal_scope.namescope + prefix
-
-    try:
-        yield
-    finally:
-        assert _threadlocal_scope.namescope.endswith(prefix), \
+class NameScope(object):
+    __slots__ = ('prefix', 'reset', '_new_scope', '_old_scope')
+
+    def __init__(self, prefix, reset=False):
+        assert prefix is None or isinstance(prefix, string_types), \
+            "NameScope takes in a string as its argument."
+        self.prefix = prefix
+        self.reset = reset
+        self._new_scope = None
+        self._old_scope = None
+
+    def __enter__(self):
+        # The saved scopes live on the instance, so it cannot be
+        # re-entered until the outer use has exited.
+        assert self._new_scope is None, \
+            "NameScope() is already active and cannot be re-entered."
+        old_scope = _threadlocal_scope.namescope
+        parent = '' if self.reset else old_scope
+        key = (parent, self.prefix)
+        new_scope = _namescope_cache.get(key)
+        if new_scope is None:
+            # The separator is only appended on a miss; hits reuse the
+            # already joined string.
+            if len(_namescope_cache) >= _NAMESCOPE_CACHE_MAX_SIZE:
+                _namescope_cache.clear()
+            new_scope = parent + self.prefix + _NAMESCOPE_SEPARATOR \
+                if self.prefix else parent
+            _namescope_cache[key] = new_scope
+        self._new_scope = new_scope
+        self._old_scope = old_scope
+        _threadlocal_scope.namescope = new_scope
+
+    def __exit__(self, *args):
+        assert _threadlocal_scope.namescope is self._new_scope, \
             "The namescope variable is changed from outside NameScope() calls."
-        _threadlocal_scope.namescope = old_scope
-
-
-@contextlib.contextmanager
-def DeviceScope(scope, node_name=None):
-    new_scope = caffe2_pb2.DeviceOption()
-    if scope:
-        assert isinstance(scope, caffe2_pb2.DeviceOption), \
-            "DeviceScope takes in a caffe2_pb2.DeviceOption as its argument."
-        new_scope.CopyFrom(scope)
-    else:
-        assert node_name, "At least one argument should be non-null in DeviceScope"
-
-    # rewrite node_name if it is explicitly given
-    if node_name:
-        new_scope.node_name = node_name
-    global _threadlocal_scope
-    old_scope = CurrentDeviceScope()
-    # nested scope should inherit the node_name if it is not explicitly set
-    if old_scope and old_scope.HasField('node_name') and \
-            not new_scope.HasField('node_name'):
-        new_scope.node_name = old_scope.node_name
-    _threadlocal_scope.devicescope = new_scope
-    try:
-        yield
-    finally:
-        assert _threadlocal_scope.devicescope == new_scope, \
+        _threadlocal_scope.namescope = self._old_scope
+        self._new_scope = None
+        self._old_scope = None
+
+
+class DeviceScope(object):
+    __slots__ = ('scope', 'node_name', '_new_scope', '_old_scope')
+
+    def __init__(self, scope, node_name=None):
+        if scope:
+            assert isinstance(scope, caffe2_pb2.DeviceOption), \
+                "DeviceScope takes in a caffe2_pb2.DeviceOption as its argument."
+        else:
+            assert node_name, \
+                "At least one argument should be non-null in DeviceScope"
+        self.scope = scope
+        self.node_name = node_name
+        self._new_scope = None
+        self._old_scope = None
+
+    def __enter__(self):
+        assert self._new_scope is None, \
+            "DeviceScope() is already active and cannot be re-entered."
+        scope = self.scope
+        node_name = self.node_name
+        old_scope = _threadlocal_scope.devicescope
+        # nested scope should inherit the node_name if it is not explicitly set
+        if not node_name and old_scope and old_scope.HasField('node_name') \
+                and not (scope and scope.HasField('node_name')):
+            node_name = old_scope.node_name
+        if node_name:
+            new_scope = caffe2_pb2.DeviceOption()
+            if scope:
+                new_scope.MergeFrom(scope)
+            new_scope.node_name = node_name
+        else:
+            # Nothing to rewrite, so use the caller's DeviceOption as is
+            # instead of copying it.
+            new_scope = scope
+        self._new_scope = new_scope
+        self._old_scope = old_scope
+        _threadlocal_scope.devicescope = new_scope
+
+    def __exit__(self, *args):
+        assert _threadlocal_scope.devicescope is self._new_scope, \
             "The device scope is changed from outside DeviceScope() calls."
-        _threadlocal_scope.devicescope = old_scope
+        _threadlocal_scope.devicescope = self._old_scope
+        self._new_scope = None
+        self._old_scope = None
 
 
-@contextlib.contextmanager
-def EmptyDeviceScope():
+class _EmptyDeviceScope(object):
     """
     Allow users to 'disable' the device scope behaviour (so it can be
     controlled at a NetDef::DeviceOption level, not overridden at
@@ -90,10 +139,23 @@ def EmptyDeviceScope():
     This sets the CurrentDeviceScope() to None, so that the field is
     not set in CreateOperator(...), etc.
     """
-    old_scope = CurrentDeviceScope()
-    try:
+    __slots__ = ()
+
+    def __call__(self):
+        # Keeps the `with EmptyDeviceScope():` spelling working on the
+        # singleton below.
+        return self
+
+    def __enter__(self):
+        _threadlocal_scope.empty_devicescope_stack.append(
+            _threadlocal_scope.devicescope)
         _threadlocal_scope.devicescope = None
-        yield
-    finally:
-        _threadlocal_scope.devicescope = old_scope
-        return
+
+    def __exit__(self, *args):
+        _threadlocal_scope.devicescope = \
+            _threadlocal_scope.empty_devicescope_stack.pop()
+
+
+# EmptyDeviceScope holds no per-call state (the saved device scopes live on
+# the thread-local stack), so a single shared instance serves every caller.
+EmptyDeviceScope = _EmptyDeviceScope()
@@ -43,6 +43,21 @@ class TestScope(unittest.TestCase):
 
         self.assertEquals(scope.CurrentNameScope(), "")
 
+    def testNamescopeNested(self):
+        self.assertEquals(scope.CurrentNameScope(), "")
+
+        with scope.NameScope("outer"):
+            with scope.NameScope("inner"):
+                first = scope.CurrentNameScope()
+                self.assertEquals(first, "outer/inner/")
+            with scope.NameScope("inner"):
+                self.assertIs(scope.CurrentNameScope(), first)
+            with scope.NameScope("reset", reset=True):
+                self.assertEquals(scope.CurrentNameScope(), "reset/")
+            self.assertEquals(scope.CurrentNameScope(), "outer/")
+
+        self.assertEquals(scope.CurrentNameScope(), "")
+
     def testNamescopeAssertion(self):
         self.assertEquals(scope.CurrentNameScope(), "")
 
@@ -64,6 +79,25 @@ class TestScope(unittest.TestCase):
 
         self.assertEquals(scope.CurrentDeviceScope(), None)
 
+    def testDevicescopeNodeName(self):
+        self.assertEquals(scope.CurrentDeviceScope(), None)
+
+        dsc = core.DeviceOption(caffe2_pb2.CUDA, 9)
+        with scope.DeviceScope(None, node_name="node_0"):
+            self.assertEquals(scope.CurrentDeviceScope().node_name, "node_0")
+            with scope.DeviceScope(dsc):
+                current = scope.CurrentDeviceScope()
+                self.assertEquals(current.node_name, "node_0")
+                self.assertEquals(current.cuda_gpu_id, 9)
+                self.assertFalse(dsc.HasField('node_name'))
+            with scope.DeviceScope(dsc, node_name="node_1"):
+                current = scope.CurrentDeviceScope()
+                self.assertEquals(current.node_name, "node_1")
+                self.assertEquals(current.cuda_gpu_id, 9)
+            self.assertEquals(scope.CurrentDeviceScope().node_name, "node_0")
+
+        self.assertEquals(scope.CurrentDeviceScope(), None)
+
     def testEmptyDevicescopeBasic(self):
         self.assertEquals(scope.CurrentDeviceScope(), None)
 
@@ -75,6 +109,21 @@ class TestScope(unittest.TestCase):
             self.assertEquals(scope.CurrentDeviceScope(), dsc)
         self.assertEquals(scope.CurrentDeviceScope(), None)
 
+    def testEmptyDevicescopeNested(self):
+        self.assertEquals(scope.CurrentDeviceScope(), None)
+
+        dsc = core.DeviceOption(caffe2_pb2.CUDA, 9)
+        dsc_inner = core.DeviceOption(caffe2_pb2.CUDA, 3)
+        with scope.DeviceScope(dsc):
+            with scope.EmptyDeviceScope():
+                with scope.DeviceScope(dsc_inner):
+                    with scope.EmptyDeviceScope():
+                        self.assertEquals(scope.CurrentDeviceScope(), None)
+                    self.assertEquals(scope.CurrentDeviceScope(), dsc_inner)
+                self.assertEquals(scope.CurrentDeviceScope(), None)
+            self.assertEquals(scope.CurrentDeviceScope(), dsc)
+        self.assertEquals(scope.CurrentDeviceScope(), None)
+
     def testDevicescopeAssertion(self):
         self.assertEquals(scope.CurrentDeviceScope(), None)
 
@@ -89,6 +138,47 @@ class TestScope(unittest.TestCase):
 
         self.assertEquals(scope.CurrentDeviceScope(), None)
 
+    def testScopesPropagateExceptions(self):
+        dsc = core.DeviceOption(caffe2_pb2.CUDA, 9)
+
+        with self.assertRaises(KeyError):
+            with scope.NameScope("test_scope"):
+                raise KeyError()
+        with self.assertRaises(KeyError):
+            with scope.DeviceScope(dsc):
+                raise KeyError()
+        with self.assertRaises(KeyError):
+            with scope.DeviceScope(dsc):
+                with scope.EmptyDeviceScope():
+                    raise KeyError()
+
+        self.assertEquals(scope.CurrentNameScope(), "")
+        self.assertEquals(scope.CurrentDeviceScope(), None)
+
+    def testScopesRejectReentry(self):
+        dsc = core.DeviceOption(caffe2_pb2.CUDA, 9)
+        name_scope = scope.NameScope("test_scope")
+        device_scope = scope.DeviceScope(dsc)
+
+        with name_scope:
+            with self.assertRaises(AssertionError):
+                with name_scope:
+                    pass
+            self.assertEquals(scope.CurrentNameScope(), "test_scope/")
+        with device_scope:
+            with self.assertRaises(AssertionError):
+                with device_scope:
+                    pass
+            self.assertEquals(scope.CurrentDeviceScope(), dsc)
+
+        self.assertEquals(scope.CurrentNameScope(), "")
+        self.assertEquals(scope.CurrentDeviceScope(), None)
+
+        # Sequential reuse after exit is fine.
+        with name_scope:
+            self.assertEquals(scope.CurrentNameScope(), "test_scope/")
+        self.assertEquals(scope.CurrentNameScope(), "")
+
     def testMultiThreaded(self):
         """
         Test that name/device scope are properly local to the thread